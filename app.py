@@ -1,9 +1,18 @@
 from flask import Flask, render_template, request, jsonify
 from config import Config
+from financial_risk import parse_request, parse_batch_csv, parse_batch_rows, score_financial_request, score_financial_batch
+from prewarm import PrewarmStore, PrewarmScheduler
+from result_store import ResultStore
+from model_router import ModelRouter
 import json
 import os
 import requests
 import base64
+import hashlib
+import hmac
+import itertools
+import threading
+import time
 from datetime import datetime
 from dotenv import load_dotenv
 from typing import List, Dict, Any, Union, Optional
@@ -20,8 +29,8 @@ def favicon():
 
 # OpenRouter Configuration
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-# Using Gemini 2.0 Flash via OpenRouter
+OPENROUTER_URL = os.getenv('OPENROUTER_URL', "https://openrouter.ai/api/v1/chat/completions")
+# Default model (Gemini 2.0 Flash via OpenRouter); the router may pick others per task
 MODEL_NAME = "google/gemini-2.0-flash-001"
 
 print(f"Server starting...")
@@ -29,8 +38,8 @@ print(f"OpenRouter API Key present: {bool(OPENROUTER_API_KEY)}")
 if OPENROUTER_API_KEY:
     print(f"Key preview: {str(OPENROUTER_API_KEY)[:10]}...")
 
-def call_openrouter(messages, model=MODEL_NAME):
-    """Helper function to call OpenRouter API"""
+def call_openrouter(messages, model=MODEL_NAME, timeout=60):
+    """Helper function to call OpenRouter API (returns None on error or timeout)"""
     if not OPENROUTER_API_KEY:
         print("Error: OPENROUTER_API_KEY not found in environment variables")
         return None
@@ -49,7 +58,7 @@ def call_openrouter(messages, model=MODEL_NAME):
     
     try:
         print(f"Sending request to OpenRouter ({model})...")
-        response = requests.post(OPENROUTER_URL, headers=headers, json=payload)
+        response = requests.post(OPENROUTER_URL, headers=headers, json=payload, timeout=timeout)
         
         if response.status_code != 200:
             print(f"OpenRouter Error Status: {response.status_code}")
@@ -61,6 +70,97 @@ def call_openrouter(messages, model=MODEL_NAME):
         print(f"OpenRouter Exception: {e}")
         return None
 
+# Model routing: each task type gets a ranked list of models with a cost ceiling
+# (see model_router.DEFAULT_ROUTES). With routing disabled every call uses MODEL_NAME.
+model_router = ModelRouter(lambda messages, model, timeout: call_openrouter(messages, model, timeout),
+                           routes=None if Config.MODEL_ROUTER_ENABLED else {},
+                           default_model=MODEL_NAME)
+
+def call_model(task, messages):
+    """Call the best available model for a task type (script, chat, simulator, analysis, vision)"""
+    if not OPENROUTER_API_KEY:
+        # Not a model failure, so don't let it count against any model's health
+        print("Error: OPENROUTER_API_KEY not found in environment variables")
+        return None
+    return model_router.complete(task, messages)
+
+# Local result store (history without a Supabase round trip)
+result_store = None
+if Config.RESULT_STORE_ENABLED:
+    store_path = Config.RESULT_STORE_PATH
+    if not os.path.isabs(store_path):
+        store_path = os.path.join(app.root_path, store_path)
+    try:
+        result_store = ResultStore(store_path, retention_days=Config.RESULT_STORE_RETENTION_DAYS)
+    except Exception as e:
+        print(f"Result store disabled: {e}")
+
+def verify_supabase_jwt(token):
+    """Return the user id (`sub`) of a valid HS256 Supabase access token, else None"""
+    try:
+        header_b64, payload_b64, signature_b64 = token.split('.')
+        decode = lambda part: base64.urlsafe_b64decode(part + '=' * (-len(part) % 4))
+        if json.loads(decode(header_b64)).get('alg') != 'HS256':
+            return None
+        expected = hmac.new(Config.SUPABASE_JWT_SECRET.encode(), f"{header_b64}.{payload_b64}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, decode(signature_b64)):
+            return None
+        payload = json.loads(decode(payload_b64))
+        if payload.get('exp') and payload['exp'] < time.time():
+            return None
+        return payload.get('sub')
+    except Exception:
+        return None
+
+def resolve_user_id():
+    """Identify the tenant for the current request.
+
+    With SUPABASE_JWT_SECRET set, only a valid `Authorization: Bearer` token is
+    trusted. Without it nobody is identified (fail closed), unless
+    RESULT_STORE_TRUST_USER_HEADER is explicitly enabled for local development,
+    in which case the X-User-Id header is used.
+    """
+    if Config.SUPABASE_JWT_SECRET:
+        auth = request.headers.get('Authorization', '')
+        if auth.startswith('Bearer '):
+            return verify_supabase_jwt(auth[len('Bearer '):])
+        return None
+    if Config.RESULT_STORE_TRUST_USER_HEADER:
+        return request.headers.get('X-User-Id') or None
+    return None
+
+def history_unavailable():
+    """Error response when history can't be served safely, else None"""
+    if result_store is None:
+        return jsonify({'error': 'Result store is disabled'}), 503
+    if not Config.SUPABASE_JWT_SECRET and not Config.RESULT_STORE_TRUST_USER_HEADER:
+        return jsonify({'error': 'History requires SUPABASE_JWT_SECRET to be configured'}), 503
+    return None
+
+def save_result(source, risk_score, scam_type, analysis_data):
+    if result_store is None:
+        return
+    user_id = resolve_user_id()
+    # Anonymous results could never be read back, so don't keep them
+    if not user_id:
+        return
+    try:
+        result_store.save(user_id, source, risk_score, scam_type, analysis_data)
+    except Exception as e:
+        print(f"Result store error: {e}")
+
+def parse_ai_json(ai_text):
+    """Parse a JSON reply that may be wrapped in a ```json code block; None if invalid"""
+    clean_text = ai_text.strip()
+    if clean_text.startswith('```json'):
+        clean_text = clean_text.replace('```json', '', 1)
+    if clean_text.endswith('```'):
+        clean_text = clean_text.rsplit('```', 1)[0]
+    try:
+        return json.loads(clean_text)
+    except json.JSONDecodeError:
+        return None
+
 # Load scam patterns
 def load_patterns():
     patterns_path = os.path.join(app.root_path, 'data', 'scam_patterns.json')
@@ -151,7 +251,7 @@ Structure:
 If the text is short or no timeline can be inferred, provide a best-guess timeline or a single 'Current State' entry.
 """
 
-    ai_text = call_openrouter([{"role": "user", "content": prompt}])
+    ai_text = call_model('analysis', [{"role": "user", "content": prompt}])
     
     result = {
         "insights": [],
@@ -195,15 +295,13 @@ def dashboard():
 def analyze_page():
     return render_template('analyze.html')
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze_conversation():
-    data = request.get_json()
-    messages = data.get('messages', [])
-    
-    if not messages:
-        return jsonify({'error': 'No messages provided'}), 400
+def analysis_cache_key(messages):
+    """Prewarm store key for a conversation (analysis only depends on the text)"""
+    full_text = " ".join([m.get('text', '').lower() for m in messages])
+    return 'analysis:' + hashlib.sha256(full_text.encode('utf-8')).hexdigest()
 
-    # Analysis Logic
+def run_conversation_analysis(messages):
+    """Score a conversation and attach AI insights (shared by /api/analyze and prewarm)"""
     # Analysis Logic
     risk_score: int = 0
     detected_patterns: List[Dict[str, Any]] = []
@@ -254,7 +352,7 @@ def analyze_conversation():
     # Generate AI Insights & Timeline
     ai_result = generate_insights(detected_patterns, detected_flags, full_text)
     
-    return jsonify({
+    return {
         'risk_score': risk_score,
         'risk_level': risk_level,
         'risk_color': risk_color,
@@ -264,7 +362,25 @@ def analyze_conversation():
         'ai_insights': ai_result.get('insights', []),
         'timeline': ai_result.get('timeline', []),
         'scam_classification': ai_result.get('scam_classification', {})
-    })
+    }
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze_conversation():
+    data = request.get_json()
+    messages = data.get('messages', [])
+    
+    if not messages:
+        return jsonify({'error': 'No messages provided'}), 400
+
+    # Demo conversations are precomputed by the prewarm scheduler
+    result = prewarm_store.get(analysis_cache_key(messages))
+    if result is None:
+        result = run_conversation_analysis(messages)
+
+    classification = result.get('scam_classification')
+    scam_type = classification.get('type') if isinstance(classification, dict) else None
+    save_result('text', result['risk_score'], scam_type, result)
+    return jsonify(result)
 
 @app.route('/api/analyze-image', methods=['POST'])
 def api_analyze_image():
@@ -333,16 +449,23 @@ def api_analyze_image():
         ]
         
         print("Sending image to OpenRouter (Gemini)...")
-        ai_response = call_openrouter(messages)
+        ai_response = call_model('vision', messages)
         print(f"AI Response: {ai_response}")
         
         if not ai_response:
              return jsonify({'error': 'Failed to get analysis from AI'}), 500
 
-        return jsonify({
+        result = {
             'analysis': ai_response,
             'timestamp': datetime.now().isoformat()
-        })
+        }
+        parsed = parse_ai_json(ai_response)
+        if isinstance(parsed, dict):
+            save_result('image', parsed.get('risk_score'), parsed.get('scam_type'), dict(result, parsed=parsed))
+        else:
+            save_result('image', 0, None, result)
+
+        return jsonify(result)
     
     except Exception as e:
         print(f"Error analyzing image: {e}")
@@ -375,7 +498,7 @@ def generate_response_script():
         """
         
         
-        ai_text = call_openrouter([{"role": "user", "content": full_prompt}])
+        ai_text = call_model('script', [{"role": "user", "content": full_prompt}])
         scripts: List[str] = []
         
         if ai_text:
@@ -436,7 +559,7 @@ Never shame victims. Be practical.
             {"role": "user", "content": user_message}
         ]
         
-        response_text = call_openrouter(messages)
+        response_text = call_model('chat', messages)
         
         if not response_text:
              return jsonify({'error': 'Failed to get response from AI'}), 500
@@ -453,86 +576,125 @@ Never shame victims. Be practical.
 @app.route('/api/calculate-financial-risk', methods=['POST'])
 def calculate_financial_risk():
     data = request.get_json()
-    amount = float(data.get('amount', 0))
-    reason = data.get('reason', '').lower()
-    payment_method = data.get('payment_method', '').lower()
-    relationship_days = int(data.get('relationship_days', 0))
-
-    relationship_days = int(data.get('relationship_days', 0))
-
-    risk_score: int = 0
-    risk_factors: List[str] = []
-
-    # 1. Amount Risk
-    if amount > 1000:
-        risk_score += 30
-        risk_factors.append("Large amount requested relative to relationship duration.")
-    elif amount > 200:
-         risk_score += 10
-
-    # 2. Relationship Duration Risk
-    if relationship_days < 14:
-        risk_score += 40
-        risk_factors.append("Request made very early in the relationship (< 2 weeks).")
-    elif relationship_days < 30:
-        risk_score += 20
-        risk_factors.append("Request made early in the relationship (< 1 month).")
-
-    # 3. Payment Method Risk
-    high_risk_methods = ['crypto', 'bitcoin', 'gift card', 'wire', 'western union', 'zelle', 'cash app']
-    if any(m in payment_method for m in high_risk_methods):
-        risk_score += 30
-        risk_factors.append(f"High-risk payment method requested: {payment_method}")
-
-    # 4. Reason Risk
-    high_risk_reasons = ['emergency', 'hospital', 'ticket', 'flight', 'investment', 'profit']
-    if any(r in reason for r in high_risk_reasons):
-        risk_score += 20
-        risk_factors.append("Reason for request is a common scam trope.")
-
-    risk_score = min(risk_score, 100)
-
-    if risk_score >= 70:
-        recommendation = "DO NOT PROCEED. This is highly likely a scam."
-        action = "Block User"
-    elif risk_score >= 40:
-        recommendation = "Proceed with extreme caution. Verify independently."
-        action = "Ask for Proof"
-    else:
-        recommendation = "Low financial risk detected, but stay alert."
-        action = "Monitor"
+    row = parse_request(data)
+    return jsonify(score_financial_request(**row))
 
+@app.route('/api/calculate-financial-risk/batch', methods=['POST'])
+def calculate_financial_risk_batch():
+    """Screen a whole payment ledger at once (JSON rows or CSV with a header row)"""
+    try:
+        if 'file' in request.files:
+            raw_rows = parse_batch_csv(request.files['file'].read().decode('utf-8-sig'))
+        elif request.mimetype == 'text/csv':
+            raw_rows = parse_batch_csv(request.get_data(as_text=True))
+        else:
+            data = request.get_json(silent=True)
+            raw_rows = data.get('rows') if isinstance(data, dict) else data
+            if not isinstance(raw_rows, list):
+                return jsonify({'error': 'Expected a JSON list of rows or {"rows": [...]}'}), 400
+
+        rows = parse_batch_rows(raw_rows)
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    results = score_financial_batch(rows)
     return jsonify({
-        'risk_score': risk_score,
-        'risk_factors': risk_factors,
-        'recommendation': recommendation,
-        'action': action
+        'count': len(results),
+        'results': results
     })
 
+# Mock data for demo
+DEMO_CONVERSATIONS = {
+    '1': [
+        {'sender': 'Stranger', 'text': 'Hello beautiful, I feel like I have known you forever.'},
+        {'sender': 'Me', 'text': 'Hi, we just met.'},
+        {'sender': 'Stranger', 'text': 'I am currently overseas on a peacekeeping mission but I will come see you soon.'},
+        {'sender': 'Stranger', 'text': 'My daughter is in the hospital and I need $500 for her surgery immediately via gift cards.'}
+    ],
+    '2': [ # Crypto
+        {'sender': 'Mentor', 'text': 'Have you heard of the new crypto investment platform using AI?'},
+        {'sender': 'Me', 'text': 'No, tell me more.'},
+        {'sender': 'Mentor', 'text': 'I made $10,000 in one week. I can guide you. Just download Trust Wallet.'},
+        {'sender': 'Mentor', 'text': 'We need to move to WhatsApp for better security.'}
+    ]
+}
+
+@app.route('/api/history')
+def history():
+    """Paginated analysis history for the signed-in user, served from the local store"""
+    unavailable = history_unavailable()
+    if unavailable:
+        return unavailable
+    user_id = resolve_user_id()
+    if not user_id:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    args = request.args
+    try:
+        page = result_store.query(
+            user_id,
+            limit=args.get('limit', 20, type=int),
+            cursor=args.get('cursor'),
+            min_risk=args.get('min_risk', type=int),
+            max_risk=args.get('max_risk', type=int),
+            scam_type=args.get('scam_type'),
+            source=args.get('source'),
+            since=args.get('since'),
+            until=args.get('until')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(page)
+
+@app.route('/api/history/<int:result_id>')
+def history_item(result_id):
+    unavailable = history_unavailable()
+    if unavailable:
+        return unavailable
+    user_id = resolve_user_id()
+    if not user_id:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    result = result_store.get(user_id, result_id)
+    if result is None:
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify(result)
+
 @app.route('/api/demo-conversation/<id>')
 def demo_conversation(id):
-    # Mock data for demo
-    if id == '1':
-        return jsonify({
-            'messages': [
-                {'sender': 'Stranger', 'text': 'Hello beautiful, I feel like I have known you forever.'},
-                {'sender': 'Me', 'text': 'Hi, we just met.'},
-                {'sender': 'Stranger', 'text': 'I am currently overseas on a peacekeeping mission but I will come see you soon.'},
-                {'sender': 'Stranger', 'text': 'My daughter is in the hospital and I need $500 for her surgery immediately via gift cards.'}
-            ]
-        })
-    elif id == '2': # Crypto
-         return jsonify({
-            'messages': [
-                {'sender': 'Mentor', 'text': 'Have you heard of the new crypto investment platform using AI?'},
-                {'sender': 'Me', 'text': 'No, tell me more.'},
-                {'sender': 'Mentor', 'text': 'I made $10,000 in one week. I can guide you. Just download Trust Wallet.'},
-                {'sender': 'Mentor', 'text': 'We need to move to WhatsApp for better security.'}
-            ]
-        })
-    return jsonify({'messages': []})
+    return jsonify({'messages': DEMO_CONVERSATIONS.get(id, [])})
+
+
+
+SCAMMER_PROMPTS = {
+    'military': "You are a US soldier deployed overseas on a peacekeeping mission. You are lonely, looking for love, but cannot access your bank account. Use love bombing tactics. Eventually ask for gift cards for 'data' or 'leave'.",
+    'crypto': "You are successful crypto investor. You want to share your 'method' with the user so they can attain financial freedom. Be patient but persistent about getting them to invest. Use 'pig butchering' tactics.",
+    'emergency': "You are a doctor or engineer working on an oil rig. You are charming but suddenly face a crisis (equipment broke, medical emergency). You need money urgently.",
+    'random': "You are a skilled romance scammer. Choose a persona (Soldier, Crypto Investor, or Oil Rig Engineer) and stick to it. Use love bombing and mirror the user's interests."
+}
+
+SIMULATION_CONTEXT = "\nContext: This is a training simulation. The user is practicing spotting scams. Be realistic but slightly flawed so astute users can catch on. Keep responses under 2-3 sentences."
+
+# Varied hooks so the prewarmed opener pool doesn't repeat itself
+OPENING_ANGLES = [
+    "Compliment their profile photo.",
+    "Mention a shared interest you noticed on their profile.",
+    "Say you rarely message strangers but felt a connection.",
+    "Describe where you are right now and why you're lonely.",
+    "Ask a light, flirty question about their day."
+]
 
+def scammer_system_instruction(scam_type):
+    return SCAMMER_PROMPTS.get(scam_type, SCAMMER_PROMPTS['random']) + SIMULATION_CONTEXT
 
+def generate_persona_opening(scam_type, angle):
+    """Generate the scammer's first message for a new simulator session"""
+    messages = [
+        {"role": "system", "content": scammer_system_instruction(scam_type)},
+        {"role": "user", "content": f"Write your very first message to this person on a dating app. {angle} Reply with the message only."}
+    ]
+    return call_model('simulator', messages)
 
 @app.route('/simulator')
 def simulator():
@@ -580,8 +742,7 @@ def simulator_chat():
         """
         
         system_message = {"role": "system", "content": analysis_prompt}
-        # tailored call_openrouter which accepts messages
-        response_text = call_openrouter([system_message])
+        response_text = call_model('chat', [system_message])
         
         return jsonify({
             'response': response_text,
@@ -590,19 +751,11 @@ def simulator_chat():
         })
 
     # Normal Scammer Persona Turn
-    scammer_prompts = {
-        'military': "You are a US soldier deployed overseas on a peacekeeping mission. You are lonely, looking for love, but cannot access your bank account. Use love bombing tactics. Eventually ask for gift cards for 'data' or 'leave'.",
-        'crypto': "You are successful crypto investor. You want to share your 'method' with the user so they can attain financial freedom. Be patient but persistent about getting them to invest. Use 'pig butchering' tactics.",
-        'emergency': "You are a doctor or engineer working on an oil rig. You are charming but suddenly face a crisis (equipment broke, medical emergency). You need money urgently.",
-        'random': "You are a skilled romance scammer. Choose a persona (Soldier, Crypto Investor, or Oil Rig Engineer) and stick to it. Use love bombing and mirror the user's interests."
-    }
-    
-    system_instruction = scammer_prompts.get(scam_type, scammer_prompts['random'])
-    system_instruction += f"\nContext: This is a training simulation. The user is practicing spotting scams. Be realistic but slightly flawed so astute users can catch on. Keep responses under 2-3 sentences."
+    system_instruction = scammer_system_instruction(scam_type)
     
     messages = [{"role": "system", "content": system_instruction}] + history + [{"role": "user", "content": user_message}]
     
-    response_text = call_openrouter(messages)
+    response_text = call_model('simulator', messages)
     
     return jsonify({
         'response': response_text,
@@ -612,6 +765,74 @@ def simulator_chat():
 
 
 
+@app.route('/api/simulator/opening')
+def simulator_opening():
+    """Opening scammer message for a new session, served from the prewarmed pool when possible"""
+    scam_type = request.args.get('scam_type', 'random')
+    if scam_type not in SCAMMER_PROMPTS:
+        scam_type = 'random'
+
+    response_text = prewarm_store.get(f'opening:{scam_type}')
+    if response_text is None:
+        angle = OPENING_ANGLES[int(time.time()) % len(OPENING_ANGLES)]
+        response_text = generate_persona_opening(scam_type, angle)
+        if not response_text:
+            return jsonify({'error': 'Failed to get response from AI'}), 500
+        prewarm_store.put(f'opening:{scam_type}', response_text)
+
+    return jsonify({
+        'response': response_text,
+        'status': 'active',
+        'count': 0
+    })
+
+# Prewarm scheduler: keeps demo analyses and persona openers ready so the first
+# interaction doesn't wait on a cold LLM round trip
+prewarm_store = PrewarmStore(ttl=Config.PREWARM_TTL_SECONDS, pool_size=Config.PREWARM_POOL_SIZE)
+prewarm_scheduler = PrewarmScheduler(prewarm_store, interval=Config.PREWARM_INTERVAL_SECONDS,
+                                     idle_after=Config.PREWARM_IDLE_SECONDS)
+
+def prewarm_demo_analysis(messages):
+    result = run_conversation_analysis(messages)
+    # Don't cache the rule-based fallback; retry the AI call next cycle instead
+    if not result['scam_classification']:
+        return None
+    return result
+
+for demo_messages in DEMO_CONVERSATIONS.values():
+    prewarm_scheduler.add_job(analysis_cache_key(demo_messages),
+                              lambda m=demo_messages: prewarm_demo_analysis(m))
+
+for persona in SCAMMER_PROMPTS:
+    angles = itertools.cycle(OPENING_ANGLES)
+    prewarm_scheduler.add_job(f'opening:{persona}',
+                              lambda p=persona, a=angles: generate_persona_opening(p, next(a)),
+                              target=Config.PREWARM_POOL_SIZE)
+
+def start_prewarm():
+    if Config.PREWARM_ENABLED and OPENROUTER_API_KEY:
+        prewarm_scheduler.start()
+
+# Start lazily on the first request a process actually serves, rather than on
+# import (gunicorn master, debug reloader parent, serverless cold starts)
+prewarm_started = False
+prewarm_start_lock = threading.Lock()
+
+@app.before_request
+def ensure_prewarm_started():
+    global prewarm_started
+    if prewarm_started:
+        return
+    with prewarm_start_lock:
+        if not prewarm_started:
+            prewarm_started = True
+            start_prewarm()
+
+@app.route('/api/model-stats')
+def model_stats():
+    """Rolling latency/error stats per model as seen by the router"""
+    return jsonify(model_router.snapshot())
+
 @app.route('/privacy')
 def privacy_page():
     return render_template('privacy.html')
@@ -5,3 +5,28 @@ class Config:
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
     DEBUG = True
     # Add other configuration variables here
+
+    # Prewarm scheduler for demo analyses and simulator openers
+    # Off by default on serverless (Vercel), where background threads are frozen between invocations
+    PREWARM_ENABLED = os.environ.get('PREWARM_ENABLED', 'false' if os.environ.get('VERCEL') else 'true').lower() == 'true'
+    PREWARM_INTERVAL_SECONDS = int(os.environ.get('PREWARM_INTERVAL_SECONDS', 900))
+    PREWARM_TTL_SECONDS = int(os.environ.get('PREWARM_TTL_SECONDS', 3600))
+    PREWARM_POOL_SIZE = int(os.environ.get('PREWARM_POOL_SIZE', 5))
+    # Each server process keeps its own pools: a full fill costs 2 demo analyses
+    # + 4 personas x PREWARM_POOL_SIZE openers (22 LLM calls by default) per
+    # worker. After startup, pools not requested within this many seconds stop
+    # being refreshed, so idle workers don't keep spending.
+    PREWARM_IDLE_SECONDS = int(os.environ.get('PREWARM_IDLE_SECONDS', 3600))
+
+    # Local SQLite store for analysis history
+    RESULT_STORE_ENABLED = os.environ.get('RESULT_STORE_ENABLED', 'true').lower() == 'true'
+    RESULT_STORE_PATH = os.environ.get('RESULT_STORE_PATH', 'instance/results.db')
+    # Used to verify Supabase access tokens so history is scoped to the signed-in user
+    SUPABASE_JWT_SECRET = os.environ.get('SUPABASE_JWT_SECRET', '')
+    # Local development only: trust the X-User-Id header when no JWT secret is set
+    RESULT_STORE_TRUST_USER_HEADER = os.environ.get('RESULT_STORE_TRUST_USER_HEADER', 'false').lower() == 'true'
+    # Stored results older than this are deleted by the writer thread
+    RESULT_STORE_RETENTION_DAYS = int(os.environ.get('RESULT_STORE_RETENTION_DAYS', 90))
+
+    # Route each AI task to the fastest healthy model within its cost ceiling
+    MODEL_ROUTER_ENABLED = os.environ.get('MODEL_ROUTER_ENABLED', 'true').lower() == 'true'
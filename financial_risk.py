@@ -0,0 +1,134 @@
+import csv
+import io
+import re
+from typing import List, Dict, Any, Iterable
+
+# Shared rule tables for the single-row and batch financial risk checks.
+# Both endpoints score every row with score_financial_request, so they can't drift apart.
+HIGH_RISK_METHODS = ['crypto', 'bitcoin', 'gift card', 'wire', 'western union', 'zelle', 'cash app']
+HIGH_RISK_REASONS = ['emergency', 'hospital', 'ticket', 'flight', 'investment', 'profit']
+
+# Substring matching, same semantics as `any(m in text for m in keywords)`
+HIGH_RISK_METHODS_RE = re.compile('|'.join(re.escape(m) for m in HIGH_RISK_METHODS))
+HIGH_RISK_REASONS_RE = re.compile('|'.join(re.escape(r) for r in HIGH_RISK_REASONS))
+
+# Thresholds (amounts in dollars, durations in days) and the score each adds
+LARGE_AMOUNT = 1000
+LARGE_AMOUNT_WEIGHT = 30
+MEDIUM_AMOUNT = 200
+MEDIUM_AMOUNT_WEIGHT = 10
+VERY_EARLY_DAYS = 14
+VERY_EARLY_WEIGHT = 40
+EARLY_DAYS = 30
+EARLY_WEIGHT = 20
+HIGH_RISK_METHOD_WEIGHT = 30
+HIGH_RISK_REASON_WEIGHT = 20
+MAX_RISK_SCORE = 100
+
+# Score cut-offs for the recommendation tiers
+BLOCK_SCORE = 70
+CAUTION_SCORE = 40
+
+LARGE_AMOUNT_FACTOR = "Large amount requested relative to relationship duration."
+VERY_EARLY_FACTOR = "Request made very early in the relationship (< 2 weeks)."
+EARLY_FACTOR = "Request made early in the relationship (< 1 month)."
+SCAM_TROPE_FACTOR = "Reason for request is a common scam trope."
+
+RECOMMENDATIONS = [
+    ("DO NOT PROCEED. This is highly likely a scam.", "Block User"),
+    ("Proceed with extreme caution. Verify independently.", "Ask for Proof"),
+    ("Low financial risk detected, but stay alert.", "Monitor"),
+]
+
+# Batch endpoint limit. End to end (JSON parse, scoring, jsonify) the batch
+# endpoint handles roughly 35-40k rows/s on one core, so a full batch stays
+# under about half a second. See the README for how this was measured.
+MAX_BATCH_ROWS = 20000
+
+
+def parse_request(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize one raw request dict the same way the single-row endpoint does"""
+    return {
+        'amount': float(data.get('amount', 0) or 0),
+        'reason': str(data.get('reason', '') or '').lower(),
+        'payment_method': str(data.get('payment_method', '') or '').lower(),
+        'relationship_days': int(data.get('relationship_days', 0) or 0),
+    }
+
+
+def _recommendation(risk_score: int):
+    if risk_score >= BLOCK_SCORE:
+        return RECOMMENDATIONS[0]
+    elif risk_score >= CAUTION_SCORE:
+        return RECOMMENDATIONS[1]
+    return RECOMMENDATIONS[2]
+
+
+def score_financial_request(amount: float, reason: str, payment_method: str, relationship_days: int) -> Dict[str, Any]:
+    """Score a single money request (inputs already normalized by parse_request)"""
+    risk_score: int = 0
+    risk_factors: List[str] = []
+
+    # 1. Amount Risk
+    if amount > LARGE_AMOUNT:
+        risk_score += LARGE_AMOUNT_WEIGHT
+        risk_factors.append(LARGE_AMOUNT_FACTOR)
+    elif amount > MEDIUM_AMOUNT:
+        risk_score += MEDIUM_AMOUNT_WEIGHT
+
+    # 2. Relationship Duration Risk
+    if relationship_days < VERY_EARLY_DAYS:
+        risk_score += VERY_EARLY_WEIGHT
+        risk_factors.append(VERY_EARLY_FACTOR)
+    elif relationship_days < EARLY_DAYS:
+        risk_score += EARLY_WEIGHT
+        risk_factors.append(EARLY_FACTOR)
+
+    # 3. Payment Method Risk
+    if HIGH_RISK_METHODS_RE.search(payment_method):
+        risk_score += HIGH_RISK_METHOD_WEIGHT
+        risk_factors.append(f"High-risk payment method requested: {payment_method}")
+
+    # 4. Reason Risk
+    if HIGH_RISK_REASONS_RE.search(reason):
+        risk_score += HIGH_RISK_REASON_WEIGHT
+        risk_factors.append(SCAM_TROPE_FACTOR)
+
+    risk_score = min(risk_score, MAX_RISK_SCORE)
+    recommendation, action = _recommendation(risk_score)
+
+    return {
+        'risk_score': risk_score,
+        'risk_factors': risk_factors,
+        'recommendation': recommendation,
+        'action': action
+    }
+
+
+def score_financial_batch(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score normalized rows with the single-row scorer, so results are identical"""
+    return [score_financial_request(**row) for row in rows]
+
+
+def parse_batch_csv(text: str) -> List[Dict[str, Any]]:
+    """Read ledger rows from CSV text with a header row (extra columns are ignored)"""
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [c for c in ('amount', 'relationship_days') if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+    return list(reader)
+
+
+def parse_batch_rows(raw_rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalize raw JSON/CSV rows, raising ValueError with the offending row index"""
+    rows = []
+    for i, raw in enumerate(raw_rows):
+        if not isinstance(raw, dict):
+            raise ValueError(f"Row {i} must be an object")
+        try:
+            rows.append(parse_request(raw))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Row {i} has an invalid amount or relationship_days")
+        if len(rows) > MAX_BATCH_ROWS:
+            raise ValueError(f"Batch exceeds the {MAX_BATCH_ROWS} row limit")
+    return rows
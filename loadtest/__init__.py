@@ -0,0 +1,5 @@
+"""Load and soak testing for CupidSecure.
+
+    python -m loadtest                 # run scenarios per gunicorn worker configuration
+    python -m loadtest.simulator       # standalone OpenRouter/Supabase simulator
+"""
@@ -0,0 +1,276 @@
+"""Closed-loop load generator and per-worker-configuration report.
+
+For every gunicorn worker configuration the runner starts the app pointed at
+the upstream simulator, then steps through increasing concurrency levels. Each
+level reports throughput, tail latency, error and degraded rates, and how many
+upstream calls the simulator served and failed. Several endpoints answer 200
+when the AI call failed, so responses are classified by body, not just status.
+The saturation point is the first level where adding clients no longer raises
+goodput (successful, non-degraded responses per second) by at least
+`--min-gain`, or where p99 latency exceeds `--slo-ms`.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from loadtest.scenarios import SCENARIOS, Scenario
+from loadtest.simulator import SimulatorServer, add_simulator_args, config_from_args
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def classify_response(path: str, response: requests.Response) -> str:
+    """'ok', 'degraded' (answered from a fallback) or 'error'"""
+    if response.status_code >= 400:
+        return "error"
+    if path not in ("/api/simulator/chat", "/api/analyze"):
+        return "ok"
+    try:
+        body = response.json()
+    except ValueError:
+        return "error"
+    if path == "/api/simulator/chat":
+        # The AI call failed but the endpoint still answers 200
+        return "ok" if body.get("response") else "error"
+    # /api/analyze falls back to rule-based results without an AI classification
+    return "ok" if body.get("scam_classification") else "degraded"
+
+
+def fetch_upstream_stats(simulator_url: Optional[str]) -> Optional[Dict[str, int]]:
+    if not simulator_url:
+        return None
+    try:
+        return requests.get(f"{simulator_url}/stats", timeout=5).json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+class AppProcess:
+    """The Flask app under gunicorn, wired to the simulator instead of the real services"""
+
+    def __init__(self, workers: int, threads: int, upstream_url: str, extra_env: Optional[Dict[str, str]] = None):
+        self.workers = workers
+        self.threads = threads
+        self.port = _free_port()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.env = dict(os.environ,
+                        OPENROUTER_URL=f"{upstream_url}/api/v1/chat/completions",
+                        OPENROUTER_API_KEY="simulator-key",
+                        NEXT_PUBLIC_SUPABASE_URL=upstream_url,
+                        SUPABASE_SERVICE_ROLE_KEY="simulator-key",
+                        PREWARM_ENABLED="false",
+                        RESULT_STORE_PATH=os.path.join(self.tmpdir.name, "results.db"),
+                        **(extra_env or {}))
+        self.proc = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 30):
+        cmd = [sys.executable, "-m", "gunicorn", "app:app",
+               "--workers", str(self.workers), "--threads", str(self.threads),
+               "--bind", f"127.0.0.1:{self.port}", "--timeout", "120"]
+        self.proc = subprocess.Popen(cmd, cwd=REPO_ROOT, env=self.env,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {self.proc.returncode}")
+            try:
+                requests.get(f"{self.url}/privacy", timeout=1)
+                return self
+            except requests.RequestException:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError("App did not become ready in time")
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.tmpdir.cleanup()
+
+
+def run_level(base_url: str, scenario_name: str, concurrency: int, duration: float, seed: int = 0) -> List[tuple]:
+    """Run `concurrency` clients back-to-back for `duration` seconds; returns (path, latency, outcome) samples"""
+    samples: List[tuple] = []
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def client(index):
+        scenario = Scenario(scenario_name, seed=seed * 1000 + index)
+        session = requests.Session()
+        local = []
+        while time.time() < stop_at:
+            method, path, body = scenario.next_request()
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=120)
+                outcome = classify_response(path, response)
+            except requests.RequestException:
+                outcome = "error"
+            local.append((path, time.perf_counter() - start, outcome))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples
+
+
+def summarize(samples: List[tuple], duration: float) -> Dict[str, Any]:
+    def stats(subset):
+        latencies = sorted(latency for _, latency, _ in subset)
+        errors = sum(1 for _, _, outcome in subset if outcome == "error")
+        degraded = sum(1 for _, _, outcome in subset if outcome == "degraded")
+        return {
+            "requests": len(subset),
+            "throughput_rps": round(len(subset) / duration, 2),
+            "goodput_rps": round((len(subset) - errors - degraded) / duration, 2),
+            "error_rate": round(errors / len(subset), 4) if subset else 0.0,
+            "degraded_rate": round(degraded / len(subset), 4) if subset else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        }
+
+    by_path: Dict[str, List[tuple]] = {}
+    for sample in samples:
+        by_path.setdefault(sample[0], []).append(sample)
+
+    summary = stats(samples)
+    summary["endpoints"] = {path: stats(subset) for path, subset in sorted(by_path.items())}
+    return summary
+
+
+def find_saturation(levels: List[Dict[str, Any]], min_gain: float, slo_ms: float) -> Optional[int]:
+    """Concurrency at which the configuration stopped scaling (None if it never did)"""
+    for previous, current in zip(levels, levels[1:]):
+        if current["p99_ms"] > slo_ms:
+            return current["concurrency"]
+        if previous["goodput_rps"] and current["goodput_rps"] < previous["goodput_rps"] * (1 + min_gain):
+            return current["concurrency"]
+    if levels and levels[0]["p99_ms"] > slo_ms:
+        return levels[0]["concurrency"]
+    return None
+
+
+def run_configuration(base_url: str, args, simulator_url: Optional[str] = None) -> Dict[str, Any]:
+    levels = []
+    for concurrency in args.concurrency:
+        if args.warmup:
+            run_level(base_url, args.scenario, concurrency, args.warmup, seed=args.seed)
+        before = fetch_upstream_stats(simulator_url)
+        samples = run_level(base_url, args.scenario, concurrency, args.duration, seed=args.seed)
+        after = fetch_upstream_stats(simulator_url)
+        level = summarize(samples, args.duration)
+        level["concurrency"] = concurrency
+        upstream = ""
+        if before and after:
+            calls = after["requests"] - before["requests"]
+            failed = after["errors"] - before["errors"]
+            level["upstream"] = {"requests": calls, "errors": failed,
+                                 "error_rate": round(failed / calls, 4) if calls else 0.0}
+            upstream = f"  upstream {failed}/{calls} failed"
+        levels.append(level)
+        print(f"    c={concurrency:<4} {level['throughput_rps']:>8.1f} req/s  "
+              f"p50 {level['p50_ms']:>8.1f} ms  p95 {level['p95_ms']:>8.1f} ms  "
+              f"p99 {level['p99_ms']:>8.1f} ms  errors {level['error_rate']:.2%}  "
+              f"degraded {level['degraded_rate']:.2%}{upstream}")
+    return {
+        "levels": levels,
+        "peak_throughput_rps": max((l["throughput_rps"] for l in levels), default=0),
+        "peak_goodput_rps": max((l["goodput_rps"] for l in levels), default=0),
+        "saturation_concurrency": find_saturation(levels, args.min_gain, args.slo_ms),
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load/soak test CupidSecure against a local upstream simulator")
+    parser.add_argument("--scenario", default="mixed", choices=sorted(SCENARIOS))
+    parser.add_argument("--workers", type=_int_list, default=[1, 2, 4], help="gunicorn worker counts, e.g. 1,2,4")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4, 16, 32, 64], help="client counts per step")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per concurrency step (raise for soak tests)")
+    parser.add_argument("--warmup", type=float, default=2, help="unmeasured seconds before each step")
+    parser.add_argument("--slo-ms", type=float, default=5000, help="p99 latency that counts as saturated")
+    parser.add_argument("--min-gain", type=float, default=0.05, help="throughput gain below which a step counts as saturated")
+    parser.add_argument("--target", help="test an already running app at this URL instead of launching gunicorn")
+    parser.add_argument("--json", dest="json_path", help="also write the full report to this file")
+    add_simulator_args(parser)
+    args = parser.parse_args(argv)
+
+    simulator = None
+    if not args.target:
+        simulator = SimulatorServer(config_from_args(args)).start()
+        print(f"Upstream simulator on {simulator.url}")
+
+    report = {"scenario": args.scenario, "duration": args.duration, "configurations": []}
+    try:
+        if args.target:
+            print(f"Target {args.target}")
+            result = run_configuration(args.target.rstrip("/"), args)
+            report["configurations"].append(dict(result, target=args.target))
+        else:
+            for workers in args.workers:
+                print(f"  workers={workers} threads={args.threads}")
+                app = AppProcess(workers, args.threads, simulator.url).start()
+                try:
+                    result = run_configuration(app.url, args, simulator_url=simulator.url)
+                finally:
+                    app.stop()
+                report["configurations"].append(dict(result, workers=workers, threads=args.threads))
+    finally:
+        if simulator:
+            simulator.stop()
+
+    print("\nSummary")
+    for config in report["configurations"]:
+        label = config.get("target") or f"workers={config['workers']} threads={config['threads']}"
+        saturation = config["saturation_concurrency"]
+        print(f"  {label}: peak {config['peak_throughput_rps']} req/s "
+              f"({config['peak_goodput_rps']} good), "
+              f"saturates at {saturation if saturation else 'n/a (not reached)'} clients")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
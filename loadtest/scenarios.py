@@ -0,0 +1,106 @@
+"""Traffic mixes replayed against the app.
+
+A scenario is a list of weighted request templates. Each template builds a
+fresh (method, path, json_body) tuple so payloads vary between requests the
+way real users' conversations do.
+"""
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+Request = Tuple[str, str, Optional[dict]]
+
+SCAM_LINES = [
+    "Hello beautiful, I feel like I have known you forever.",
+    "I am currently overseas on a peacekeeping mission but I will come see you soon.",
+    "My daughter is in the hospital and I need $500 for her surgery immediately via gift cards.",
+    "Have you heard of the new crypto investment platform using AI?",
+    "I made $10,000 in one week. I can guide you. Just download Trust Wallet.",
+    "We need to move to WhatsApp for better security.",
+    "My bank account is frozen, can you transfer the customs fee?",
+]
+NORMAL_LINES = [
+    "Hi! How was your weekend?",
+    "I went hiking with my sister, it was lovely.",
+    "Want to grab coffee on Saturday?",
+    "That movie was hilarious, thanks for the recommendation.",
+    "Sure, see you at 3pm.",
+]
+CHAT_QUESTIONS = [
+    "Is it normal for someone I met online to ask for gift cards?",
+    "How can I verify someone's identity before meeting them?",
+    "He says he's an engineer on an oil rig and needs money for equipment. Is this a scam?",
+    "What are common signs of a crypto romance scam?",
+]
+SIMULATOR_REPLIES = [
+    "Hi! Where are you deployed?",
+    "That sounds hard, why can't you use your bank?",
+    "I don't send money to people I haven't met.",
+    "Can we video call first?",
+]
+PERSONAS = ["military", "crypto", "emergency", "random"]
+
+
+def analyze_request(rng: random.Random) -> Request:
+    lines = SCAM_LINES if rng.random() < 0.6 else NORMAL_LINES
+    messages = [{"sender": rng.choice(["Stranger", "Me"]), "text": rng.choice(lines)}
+                for _ in range(rng.randint(2, 12))]
+    return ("POST", "/api/analyze", {"messages": messages})
+
+
+def chat_request(rng: random.Random) -> Request:
+    return ("POST", "/api/chat", {"message": rng.choice(CHAT_QUESTIONS)})
+
+
+# simulator_chat switches to the (longer) reveal/analysis prompt at this turn count
+SIMULATOR_MAX_TURNS = 10
+# A 10-turn session ends in one reveal, so roughly 1 in 11 requests is a reveal
+REVEAL_SHARE = 1 / (SIMULATOR_MAX_TURNS + 1)
+
+
+def simulator_request(rng: random.Random) -> Request:
+    reveal = rng.random() < REVEAL_SHARE
+    turns = rng.randint(SIMULATOR_MAX_TURNS, SIMULATOR_MAX_TURNS + 2) if reveal else rng.randint(0, SIMULATOR_MAX_TURNS - 1)
+    history = []
+    for _ in range(turns):
+        history.append({"role": "user", "content": rng.choice(SIMULATOR_REPLIES)})
+        history.append({"role": "assistant", "content": "Simulated persona reply."})
+    return ("POST", "/api/simulator/chat", {
+        "message": "Reveal Tactics" if reveal else rng.choice(SIMULATOR_REPLIES),
+        "history": history,
+        "count": turns,
+        "scam_type": rng.choice(PERSONAS),
+        "preferences": {"tone": "Professional", "style": "Detailed"}
+    })
+
+
+def intel_stats_request(rng: random.Random) -> Request:
+    return ("GET", "/api/intel-stats", None)
+
+
+def image_request(rng: random.Random) -> Request:
+    # 1x1 PNG; the simulator only looks at the payload shape, not the pixels
+    pixel = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+    return ("POST", "/api/analyze-image", {"image": f"data:image/png;base64,{pixel}"})
+
+
+SCENARIOS: Dict[str, List[Tuple[int, Callable[[random.Random], Request]]]] = {
+    # Observed production-like mix
+    "mixed": [(40, analyze_request), (25, chat_request), (25, simulator_request), (10, intel_stats_request)],
+    "analyze": [(85, analyze_request), (15, image_request)],
+    "chat": [(50, chat_request), (50, simulator_request)],
+    "dashboard": [(100, intel_stats_request)],
+}
+
+
+class Scenario:
+    def __init__(self, name: str, seed: Optional[int] = None):
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+        self.name = name
+        self.templates = [template for _, template in SCENARIOS[name]]
+        self.weights = [weight for weight, _ in SCENARIOS[name]]
+        self._rng = random.Random(seed)
+
+    def next_request(self) -> Request:
+        template = self._rng.choices(self.templates, weights=self.weights)[0]
+        return template(self._rng)
@@ -0,0 +1,273 @@
+"""Local stand-in for OpenRouter and Supabase PostgREST.
+
+Serves the two upstream calls the app makes:
+
+- POST /api/v1/chat/completions (plain, streaming and vision payloads)
+- GET  /rest/v1/conversation_analyses (the intel-stats query)
+
+Latency is drawn from a log-normal distribution around a configurable median
+and a fraction of requests fail with a configurable status, so capacity tests
+see realistic upstream behaviour without touching the real services.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+SCAM_TYPES = ["Military Romance", "Crypto Investment / Pig Butchering", "Medical Emergency", "Oil Rig / Engineer", "None/Unknown"]
+
+
+@dataclass
+class LatencyProfile:
+    """Log-normal latency (median in ms, sigma of the underlying normal) plus an error rate"""
+    median_ms: float = 800
+    sigma: float = 0.5
+    error_rate: float = 0.0
+    error_status: int = 500
+
+    def sample(self, rng: random.Random) -> float:
+        return self.median_ms * math.exp(rng.gauss(0, self.sigma)) / 1000.0
+
+
+@dataclass
+class SimulatorConfig:
+    chat: LatencyProfile
+    vision: LatencyProfile
+    supabase: LatencyProfile
+    stream_chunks: int = 8
+    rows: int = 500
+    seed: int = 0
+
+
+def _is_vision(messages):
+    return any(isinstance(m.get("content"), list) and
+               any(part.get("type") == "image_url" for part in m["content"])
+               for m in messages)
+
+
+def _prompt_text(messages):
+    parts = []
+    for m in messages:
+        content = m.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(p.get("text", "") for p in content if p.get("type") == "text")
+    return "\n".join(parts)
+
+
+def fake_completion(messages, rng: random.Random) -> str:
+    """Pick a plausible reply shaped like what the calling endpoint expects to parse"""
+    prompt = _prompt_text(messages)
+    if _is_vision(messages):
+        return json.dumps({
+            "risk_score": rng.randint(0, 100),
+            "scam_type": rng.choice(SCAM_TYPES),
+            "red_flags": [{"title": "Simulated flag", "description": "Generated by the load test simulator."}],
+            "timeline": [{"phase": "Day 1", "event": "First contact", "risk_score": rng.randint(0, 100)}],
+            "verdict": "Simulated verdict."
+        })
+    if "Conversation excerpt" in prompt:
+        return json.dumps({
+            "insights": [{"type": "warning", "title": "Simulated insight", "description": "Generated by the load test simulator."}],
+            "timeline": [{"phase": "Day 1", "event": "First contact", "risk_score": rng.randint(0, 100)}],
+            "scam_classification": {"type": rng.choice(SCAM_TYPES), "description": "Simulated.", "avg_loss": "$2,500", "probability": "Medium"}
+        })
+    if "JSON array of strings" in prompt:
+        return json.dumps(["Simulated script one.", "Simulated script two.", "Simulated script three."])
+    return "Simulated reply. " * rng.randint(5, 30)
+
+
+def fake_analysis_rows(count: int, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    rows = []
+    for _ in range(count):
+        created_at = now - timedelta(seconds=rng.randint(0, 7 * 24 * 3600))
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": f"user-{rng.randint(1, max(1, count // 5))}",
+            "created_at": created_at.isoformat(),
+            "risk_score": rng.randint(0, 100),
+            "analysis_data": {"scam_classification": {"type": rng.choice(SCAM_TYPES)}}
+        })
+    return rows
+
+
+def make_handler(config: SimulatorConfig):
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+    rows = fake_analysis_rows(config.rows, rng)
+    stats = {"requests": 0, "errors": 0}
+
+    class SimulatorHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _draw(self, profile: LatencyProfile):
+            with rng_lock:
+                stats["requests"] += 1
+                latency = profile.sample(rng)
+                failed = rng.random() < profile.error_rate
+                if failed:
+                    stats["errors"] += 1
+            return latency, failed
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/stats":
+                return self._send_json(200, stats)
+            if path != "/rest/v1/conversation_analyses":
+                return self._send_json(404, {"error": "not found"})
+
+            latency, failed = self._draw(config.supabase)
+            time.sleep(latency)
+            if failed:
+                return self._send_json(config.supabase.error_status, {"message": "Simulated PostgREST error"})
+            self._send_json(200, rows)
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/api/v1/chat/completions":
+                return self._send_json(404, {"error": "not found"})
+
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            messages = payload.get("messages", [])
+            model = payload.get("model", "simulated")
+            profile = config.vision if _is_vision(messages) else config.chat
+
+            latency, failed = self._draw(profile)
+            with rng_lock:
+                content = fake_completion(messages, rng)
+
+            if payload.get("stream"):
+                return self._stream(model, content, latency, failed, profile)
+
+            time.sleep(latency)
+            if failed:
+                return self._send_json(profile.error_status, {"error": {"message": "Simulated upstream error", "code": profile.error_status}})
+            self._send_json(200, {
+                "id": f"gen-{uuid.uuid4().hex}",
+                "model": model,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(_prompt_text(messages)) // 4, "completion_tokens": len(content) // 4}
+            })
+
+        def _stream(self, model, content, latency, failed, profile):
+            # Time to first token is a fraction of the total; the rest is spread across chunks
+            chunks = max(1, config.stream_chunks)
+            time.sleep(latency * 0.3)
+            if failed:
+                return self._send_json(profile.error_status, {"error": {"message": "Simulated upstream error", "code": profile.error_status}})
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            size = math.ceil(len(content) / chunks)
+            gen_id = f"gen-{uuid.uuid4().hex}"
+            for i in range(chunks):
+                piece = content[i * size:(i + 1) * size]
+                event = {"id": gen_id, "model": model, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(latency * 0.7 / chunks)
+            final = {"id": gen_id, "model": model, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+            self.wfile.flush()
+
+    return SimulatorHandler
+
+
+class SimulatorServer:
+    """Runs the simulator on a background thread (used by the load test runner)"""
+
+    def __init__(self, config: SimulatorConfig, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(config))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="upstream-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_simulator_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=800, help="median chat completion latency")
+    parser.add_argument("--vision-latency-ms", type=float, default=2500, help="median vision completion latency")
+    parser.add_argument("--supabase-latency-ms", type=float, default=60, help="median PostgREST query latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal spread (0 = fixed latency)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status used for simulated failures")
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=500, help="conversation_analyses rows returned to intel-stats")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args) -> SimulatorConfig:
+    def profile(median):
+        return LatencyProfile(median_ms=median, sigma=args.sigma, error_rate=args.error_rate, error_status=args.error_status)
+    return SimulatorConfig(
+        chat=profile(args.latency_ms),
+        vision=profile(args.vision_latency_ms),
+        supabase=profile(args.supabase_latency_ms),
+        stream_chunks=args.stream_chunks,
+        rows=args.rows,
+        seed=args.seed
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local OpenRouter/Supabase simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_simulator_args(parser)
+    args = parser.parse_args(argv)
+
+    server = SimulatorServer(config_from_args(args), host=args.host, port=args.port)
+    print(f"Simulator listening on {server.url}")
+    print(f"  OPENROUTER_URL={server.url}/api/v1/chat/completions")
+    print(f"  NEXT_PUBLIC_SUPABASE_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Approximate OpenRouter prices, USD per 1M tokens (blended input/output)
+MODEL_COSTS = {
+    "google/gemini-2.0-flash-lite-001": 0.075,
+    "google/gemini-2.0-flash-001": 0.10,
+    "meta-llama/llama-3.1-8b-instruct": 0.02,
+    "openai/gpt-4o-mini": 0.15,
+}
+
+# Total seconds one request may spend across all attempts. gunicorn kills a
+# worker after 30s by default, so this leaves room for the rest of the request.
+DEFAULT_DEADLINE = 25
+
+# Task type -> ranked models, the most we're willing to pay per 1M tokens and
+# how long (seconds) one attempt may take before falling back.
+# Vision only lists multimodal models.
+DEFAULT_ROUTES = {
+    "script": {"models": ["google/gemini-2.0-flash-lite-001", "meta-llama/llama-3.1-8b-instruct", "google/gemini-2.0-flash-001"], "max_cost": 0.10, "timeout": 8},
+    "chat": {"models": ["google/gemini-2.0-flash-001", "google/gemini-2.0-flash-lite-001", "openai/gpt-4o-mini"], "max_cost": 0.15, "timeout": 12},
+    "simulator": {"models": ["google/gemini-2.0-flash-lite-001", "google/gemini-2.0-flash-001", "meta-llama/llama-3.1-8b-instruct"], "max_cost": 0.10, "timeout": 8},
+    "analysis": {"models": ["google/gemini-2.0-flash-001", "openai/gpt-4o-mini"], "max_cost": 0.20, "timeout": 15},
+    "vision": {"models": ["google/gemini-2.0-flash-001", "openai/gpt-4o-mini"], "max_cost": 0.20, "timeout": 20},
+}
+
+
+class ModelStats:
+    """Rolling latency and error rate for one model over the last `window` seconds"""
+
+    def __init__(self, window: float = 300, max_samples: int = 50):
+        self.window = window
+        self.samples: deque = deque(maxlen=max_samples)  # (timestamp, latency, ok)
+
+    def record(self, latency: float, ok: bool):
+        self.samples.append((time.time(), latency, ok))
+
+    def _recent(self):
+        cutoff = time.time() - self.window
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        return self.samples
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = self._recent()
+        successes = [latency for _, latency, ok in samples if ok]
+        return {
+            "calls": len(samples),
+            "error_rate": (1 - len(successes) / len(samples)) if samples else 0.0,
+            "avg_latency": (sum(successes) / len(successes)) if successes else None,
+        }
+
+
+class ModelRouter:
+    """Picks a model per task type and falls back on failure.
+
+    `send(messages, model, timeout)` performs the actual completion and returns
+    the text or None on failure or timeout (the call_openrouter contract).
+    Stats are kept per (task, model), since one model's latency differs a lot
+    between short chat prompts and long analysis prompts. Among a task's models
+    within its cost ceiling, healthy measured ones are tried fastest first by
+    rolling average latency, then unmeasured ones in their configured rank.
+    With probability `explore_rate` a model with too few recent samples is
+    tried first so its latency gets measured. Unhealthy models are only tried
+    once every healthy option has failed. All attempts for one request share
+    `deadline` seconds; once it is used up no further models are tried.
+    """
+
+    def __init__(self, send: Callable[[List[Dict[str, Any]], str, float], Optional[str]],
+                 routes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 costs: Optional[Dict[str, float]] = None,
+                 default_model: Optional[str] = None,
+                 max_error_rate: float = 0.5, min_calls: int = 3,
+                 window: float = 300, explore_rate: float = 0.05,
+                 seed: Optional[int] = None, default_timeout: float = 20,
+                 deadline: float = DEFAULT_DEADLINE):
+        self.send = send
+        self.routes = routes if routes is not None else DEFAULT_ROUTES
+        self.costs = costs if costs is not None else MODEL_COSTS
+        self.default_model = default_model
+        self.max_error_rate = max_error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.explore_rate = explore_rate
+        self.default_timeout = default_timeout
+        self.deadline = deadline
+        self._random = random.Random(seed)
+        self.stats: Dict[tuple, ModelStats] = {}
+        self._lock = threading.Lock()
+
+        # An unpriced model would slip past every cost ceiling
+        for task, route in self.routes.items():
+            unpriced = [m for m in route["models"] if m not in self.costs]
+            if unpriced:
+                raise ValueError(f"Route '{task}' lists models without a cost: {', '.join(unpriced)}")
+
+    def _stats(self, task: str, model: str) -> ModelStats:
+        key = (task, model)
+        if key not in self.stats:
+            self.stats[key] = ModelStats(window=self.window)
+        return self.stats[key]
+
+    def candidates(self, task: str) -> List[str]:
+        """Models to try for `task`, in order"""
+        route = self.routes.get(task)
+        if not route:
+            return [self.default_model] if self.default_model else []
+
+        max_cost = route.get("max_cost")
+        models = [m for m in route["models"]
+                  if max_cost is None or self.costs[m] <= max_cost]
+        if not models and self.default_model:
+            models = [self.default_model]
+
+        measured, unmeasured, unhealthy, undersampled = [], [], [], []
+        with self._lock:
+            for rank, model in enumerate(models):
+                snap = self._stats(task, model).snapshot()
+                if snap["calls"] >= self.min_calls and snap["error_rate"] > self.max_error_rate:
+                    unhealthy.append((snap["error_rate"], rank, model))
+                    continue
+                if snap["avg_latency"] is not None:
+                    measured.append((snap["avg_latency"], rank, model))
+                else:
+                    unmeasured.append(model)
+                if snap["calls"] < self.min_calls:
+                    undersampled.append(model)
+            explore = undersampled and self._random.random() < self.explore_rate
+            probe = self._random.choice(undersampled) if explore else None
+
+        ordered = [m for _, _, m in sorted(measured)] + unmeasured
+        if probe:
+            ordered.remove(probe)
+            ordered.insert(0, probe)
+        return ordered + [m for _, _, m in sorted(unhealthy)]
+
+    def complete(self, task: str, messages: List[Dict[str, Any]]) -> Optional[str]:
+        timeout = self.routes.get(task, {}).get("timeout", self.default_timeout)
+        deadline = time.time() + self.deadline
+        for model in self.candidates(task):
+            start = time.time()
+            remaining = deadline - start
+            if remaining <= 0:
+                print(f"Model router: {task} ran out of time before trying {model}")
+                break
+            try:
+                result = self.send(messages, model, min(timeout, remaining))
+            except Exception as e:
+                print(f"Model router: {model} raised {e}")
+                result = None
+            latency = time.time() - start
+
+            # An attempt cut short by the request deadline says nothing about the model
+            cut_short = result is None and remaining < timeout and latency >= remaining
+            if not cut_short:
+                with self._lock:
+                    self._stats(task, model).record(latency, result is not None)
+            if result is not None:
+                return result
+            print(f"Model router: {model} failed for {task}, falling back")
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Stats nested as {task: {model: stats}}"""
+        with self._lock:
+            result: Dict[str, Dict[str, Any]] = {}
+            for (task, model), stats in self.stats.items():
+                result.setdefault(task, {})[model] = stats.snapshot()
+            return result
+
+
+class SimulatedModelBackend:
+    """Stand-in for call_openrouter that fakes heterogeneous model behaviour.
+
+    `profiles` maps model -> {"latency": seconds, "jitter": seconds,
+    "error_rate": 0-1}. Calls slower than the timeout give up after `timeout`
+    seconds and fail, like a client-side request timeout. Pass an instance as
+    ModelRouter's `send` to exercise routing and fallback locally without an
+    API key.
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, float]], reply: str = "Simulated reply", seed: Optional[int] = None):
+        self.profiles = profiles
+        self.reply = reply
+        self.calls: List[str] = []
+        self._random = random.Random(seed)
+
+    def __call__(self, messages: List[Dict[str, Any]], model: str, timeout: Optional[float] = None) -> Optional[str]:
+        self.calls.append(model)
+        profile = self.profiles.get(model, {})
+        latency = max(0.0, profile.get("latency", 0.1) + self._random.uniform(-1, 1) * profile.get("jitter", 0))
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            return None
+        time.sleep(latency)
+        if self._random.random() < profile.get("error_rate", 0):
+            return None
+        return f"{self.reply} ({model})"
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PrewarmStore:
+    """Thread-safe local store of precomputed responses.
+
+    Each key holds a small rotating pool. `get` hands out the next fresh entry
+    in round-robin order so repeated visitors see varied responses, and drops
+    anything older than `ttl` seconds. It also remembers when each pool was
+    last asked for, so the scheduler can stop refreshing pools nobody uses.
+    """
+
+    def __init__(self, ttl: float, pool_size: int, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.pool_size = max(1, pool_size)
+        self.clock = clock
+        self._pools: Dict[str, deque] = {}
+        self._last_requested: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            # Rotation reorders the pool, so evict by age rather than position
+            if len(pool) >= self.pool_size:
+                pool.remove(min(pool, key=lambda entry: entry[0]))
+            pool.append((self.clock(), value))
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                return None
+            now = self.clock()
+            # Only track keys that have a pool, so arbitrary lookups can't grow this
+            self._last_requested[key] = now
+            if not pool:
+                return None
+            fresh = [entry for entry in pool if now - entry[0] <= self.ttl]
+            if len(fresh) != len(pool):
+                pool.clear()
+                pool.extend(fresh)
+            if not pool:
+                return None
+            pool.rotate(-1)
+            return pool[-1][1]
+
+    def fresh_count(self, key: str, max_age: Optional[float] = None) -> int:
+        """Number of entries for `key` no older than `max_age` (default: the TTL)"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            pool = self._pools.get(key, ())
+            now = self.clock()
+            return sum(1 for created_at, _ in pool if now - created_at <= max_age)
+
+    def last_requested(self, key: str) -> Optional[float]:
+        with self._lock:
+            return self._last_requested.get(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            keys = list(self._pools.keys())
+        return {key: self.fresh_count(key) for key in keys}
+
+
+class PrewarmScheduler:
+    """Runs prewarm jobs once at startup and then every `interval` seconds.
+
+    A job is a (key, target, producer) tuple: the scheduler calls `producer()`
+    until `key` holds `target` entries that will still be fresh at the next
+    cycle (younger than `ttl - interval`), replacing the oldest ones, so pools
+    are refreshed before they expire instead of after. Producers return None
+    on failure (same as call_openrouter), in which case the key is retried on
+    the next cycle.
+
+    The first cycle fills every job. After that a key is only refreshed if it
+    was requested within the last `idle_after` seconds, so idle pools (and
+    idle worker processes) stop spending LLM calls and simply expire.
+    """
+
+    def __init__(self, store: PrewarmStore, interval: float, idle_after: Optional[float] = None):
+        self.store = store
+        self.interval = interval
+        self.idle_after = idle_after
+        self.jobs: List[tuple] = []
+        # Entries older than this would expire before the next cycle
+        self.refresh_age = max(0.0, store.ttl - interval)
+        if interval >= store.ttl:
+            print(f"Prewarm interval ({interval}s) >= TTL ({store.ttl}s); pools will go cold between cycles")
+        self.last_run: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_job(self, key: str, producer: Callable[[], Any], target: int = 1):
+        self.jobs.append((key, min(target, self.store.pool_size), producer))
+
+    def _is_idle(self, key: str) -> bool:
+        if self.idle_after is None or self.last_run is None:
+            return False
+        last_requested = self.store.last_requested(key)
+        return last_requested is None or self.store.clock() - last_requested > self.idle_after
+
+    def run_once(self):
+        for key, target, producer in self.jobs:
+            if self._is_idle(key):
+                continue
+            missing = target - self.store.fresh_count(key, max_age=self.refresh_age)
+            for _ in range(missing):
+                if self._stop.is_set():
+                    return
+                try:
+                    value = producer()
+                except Exception as e:
+                    print(f"Prewarm error for {key}: {e}")
+                    value = None
+                if value is None:
+                    break
+                self.store.put(key, value)
+        self.last_run = self.store.clock()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='prewarm', daemon=True)
+        self._thread.start()
+        print(f"Prewarm scheduler started ({len(self.jobs)} jobs, every {self.interval}s)")
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,237 @@
+import base64
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    source TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    risk_score INTEGER NOT NULL DEFAULT 0,
+    scam_type TEXT,
+    analysis_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_user_created ON analysis_results (user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_results_user_risk ON analysis_results (user_id, risk_score);
+CREATE INDEX IF NOT EXISTS idx_results_user_scam_type ON analysis_results (user_id, scam_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_results_created ON analysis_results (created_at);
+"""
+
+INSERT_SQL = """
+INSERT INTO analysis_results (user_id, source, created_at, risk_score, scam_type, analysis_data)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+MAX_PAGE_SIZE = 100
+PURGE_INTERVAL = 3600
+
+
+def utc_isoformat(dt: datetime) -> str:
+    """Fixed-width UTC timestamp, so stored values compare correctly as strings"""
+    return dt.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+def parse_timestamp(value: str, name: str) -> str:
+    """Normalize an ISO 8601 filter value to the stored UTC format (naive = UTC)"""
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid {name} timestamp: {value!r}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return utc_isoformat(parsed)
+
+
+def encode_cursor(created_at: str, result_id: int) -> str:
+    """Opaque, URL-safe pagination cursor for the row (created_at, id)"""
+    return base64.urlsafe_b64encode(f"{created_at}|{result_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, result_id = raw.rsplit('|', 1)
+        return parse_timestamp(created_at, 'cursor'), int(result_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ResultStore:
+    """Local SQLite store for analysis results, keyed by user (tenant).
+
+    Writes go through a queue drained by a single background thread that
+    inserts in batches, so request handlers never wait on disk. Reads use a
+    per-thread connection; WAL mode lets them run alongside the writer.
+    """
+
+    def __init__(self, path: str, batch_size: int = 200, flush_interval: float = 0.5,
+                 retention_days: Optional[int] = None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._last_purge = 0.0
+        self._queue: queue.Queue = queue.Queue()
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = _connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = _connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._write_loop, name='result-writer', daemon=True)
+        self._thread.start()
+
+    def save(self, user_id: Optional[str], source: str, risk_score: Any, scam_type: Optional[str], analysis_data: Dict[str, Any]):
+        """Queue one result for the background writer (non-blocking)"""
+        try:
+            risk_score = int(risk_score or 0)
+        except (TypeError, ValueError):
+            risk_score = 0
+        created_at = utc_isoformat(datetime.now(timezone.utc))
+        self._queue.put((user_id, source, created_at, risk_score, scam_type or None, json.dumps(analysis_data)))
+        self.start()
+
+    def purge_expired(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """Delete results older than the retention window; returns rows removed"""
+        self._last_purge = time.time()
+        if not self.retention_days:
+            return 0
+        cutoff = utc_isoformat(datetime.now(timezone.utc) - timedelta(days=self.retention_days))
+        conn = conn or self._reader()
+        with conn:
+            return conn.execute("DELETE FROM analysis_results WHERE created_at < ?", (cutoff,)).rowcount
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        while True:
+            if time.time() - self._last_purge >= PURGE_INTERVAL:
+                try:
+                    self.purge_expired(conn)
+                except sqlite3.Error as e:
+                    print(f"Result store purge error: {e}")
+            try:
+                batch = [self._queue.get(timeout=PURGE_INTERVAL)]
+            except queue.Empty:
+                continue
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(INSERT_SQL, batch)
+            except sqlite3.Error as e:
+                print(f"Result store write error ({len(batch)} rows dropped): {e}")
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued result has been written"""
+        self._queue.join()
+
+    def query(self, user_id: str, limit: int = 20, cursor: Optional[str] = None,
+              min_risk: Optional[int] = None, max_risk: Optional[int] = None,
+              scam_type: Optional[str] = None, source: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """Newest-first history for one user with optional filters.
+
+        Pagination is keyset-based: pass the returned `next_cursor` back in to
+        get the following page, which stays fast however deep the history is.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        clauses = ["user_id = ?"]
+        params: List[Any] = [user_id]
+
+        if min_risk is not None:
+            clauses.append("risk_score >= ?")
+            params.append(min_risk)
+        if max_risk is not None:
+            clauses.append("risk_score <= ?")
+            params.append(max_risk)
+        if scam_type:
+            clauses.append("scam_type = ?")
+            params.append(scam_type)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(parse_timestamp(since, 'since'))
+        if until:
+            clauses.append("created_at < ?")
+            params.append(parse_timestamp(until, 'until'))
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([cursor_created_at, cursor_created_at, cursor_id])
+
+        sql = (
+            "SELECT id, user_id, source, created_at, risk_score, scam_type, analysis_data "
+            "FROM analysis_results WHERE " + " AND ".join(clauses) +
+            " ORDER BY created_at DESC, id DESC LIMIT ?"
+        )
+        params.append(limit + 1)
+        rows = self._reader().execute(sql, params).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        results = [{
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'source': row['source'],
+            'created_at': row['created_at'],
+            'risk_score': row['risk_score'],
+            'scam_type': row['scam_type'],
+            'analysis_data': json.loads(row['analysis_data'])
+        } for row in rows]
+
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+
+        return {'results': results, 'next_cursor': next_cursor}
+
+    def get(self, user_id: str, result_id: int) -> Optional[Dict[str, Any]]:
+        row = self._reader().execute(
+            "SELECT id, user_id, source, created_at, risk_score, scam_type, analysis_data "
+            "FROM analysis_results WHERE user_id = ? AND id = ?",
+            (user_id, result_id)
+        ).fetchone()
+        if row is None:
+            return None
+        result = dict(row)
+        result['analysis_data'] = json.loads(result['analysis_data'])
+        return result
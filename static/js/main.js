@@ -20,6 +20,20 @@ async function loadDemo(convId) {
     }
 }
 
+// JSON headers plus the Supabase access token, so the server can file results under the signed-in user
+async function apiHeaders() {
+    const headers = { 'Content-Type': 'application/json' };
+    if (window.supabaseClient) {
+        try {
+            const { data: { session } } = await window.supabaseClient.auth.getSession();
+            if (session) headers['Authorization'] = `Bearer ${session.access_token}`;
+        } catch (error) {
+            console.error('Error reading session:', error);
+        }
+    }
+    return headers;
+}
+
 // Add new message row
 function addMessage(sender = '', text = '') {
     const messagesList = document.getElementById('messagesList');
@@ -186,7 +200,7 @@ async function analyzeConversation() {
         try {
             const response = await fetch('/api/analyze', {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: await apiHeaders(),
                 body: JSON.stringify({ messages })
             });
             textResults = await response.json();
@@ -213,7 +227,7 @@ async function analyzeConversation() {
             document.getElementById('riskMessage').textContent = 'ANALYZING IMAGE...';
             const imgResponse = await fetch('/api/analyze-image', {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: await apiHeaders(),
                 body: JSON.stringify({ image: imgElement.src })
             });
             const imgData = await imgResponse.json();
@@ -0,0 +1,56 @@
+import itertools
+
+import pytest
+
+from app import app
+from financial_risk import MAX_BATCH_ROWS
+
+AMOUNTS = [0, 200, 200.01, 1000, 1000.01, 5000, "750"]
+DAYS = [0, 13, 14, 29, 30, 365, 10**20, "21"]
+METHODS = ["", "Gift Card", "bank transfer", "Western Union", "paypal", "Bitcoin ATM"]
+REASONS = ["", "rent", "Hospital bill", "flight ticket", "profit share"]
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_batch_matches_single_row_endpoint(client):
+    rows = [
+        {"amount": amount, "relationship_days": days, "payment_method": method, "reason": reason}
+        for amount, days, method, reason in itertools.product(AMOUNTS, DAYS, METHODS, REASONS)
+    ]
+    response = client.post("/api/calculate-financial-risk/batch", json={"rows": rows})
+    assert response.status_code == 200
+    batch = response.get_json()["results"]
+
+    assert len(batch) == len(rows)
+    for row, result in zip(rows, batch):
+        single = client.post("/api/calculate-financial-risk", json=row).get_json()
+        assert result == single
+
+
+def test_batch_accepts_csv(client):
+    csv_text = "amount,reason,payment_method,relationship_days\n5000,hospital,Gift Card,3\n10,,,400\n"
+    response = client.post("/api/calculate-financial-risk/batch", data=csv_text, content_type="text/csv")
+    results = response.get_json()["results"]
+    assert [r["risk_score"] for r in results] == [100, 0]
+    assert results[0]["action"] == "Block User"
+
+
+@pytest.mark.parametrize("body", [
+    '[{"amount": 1, "relationship_days": Infinity}]',
+    '[{"amount": 1' + '0' * 400 + ', "relationship_days": 1}]',
+    '[{"amount": "abc", "relationship_days": 1}]',
+])
+def test_batch_rejects_bad_rows_with_index(client, body):
+    response = client.post("/api/calculate-financial-risk/batch", data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert "Row 0" in response.get_json()["error"]
+
+
+def test_batch_row_limit(client):
+    rows = [{"amount": 1, "relationship_days": 1}] * (MAX_BATCH_ROWS + 1)
+    response = client.post("/api/calculate-financial-risk/batch", json=rows)
+    assert response.status_code == 400
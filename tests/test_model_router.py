@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from model_router import ModelRouter, SimulatedModelBackend
+
+COSTS = {"fast": 0.01, "slow": 0.01, "broken": 0.01, "hangs": 0.01, "pricey": 1.0}
+
+
+def make_router(backend, routes, **kwargs):
+    kwargs.setdefault("explore_rate", 0.0)
+    return ModelRouter(backend, routes=routes, costs=COSTS, seed=0, **kwargs)
+
+
+def test_prefers_fastest_measured_model():
+    backend = SimulatedModelBackend({"slow": {"latency": 0.03}, "fast": {"latency": 0.005}}, seed=0)
+    router = make_router(backend, {"chat": {"models": ["slow", "fast"], "max_cost": 0.1}})
+
+    # Measure both, then the faster one should win despite ranking second
+    for model in ("slow", "fast"):
+        for _ in range(3):
+            router._stats("chat", model).record(backend.profiles[model]["latency"], True)
+    assert router.candidates("chat") == ["fast", "slow"]
+
+    backend.calls.clear()
+    for _ in range(5):
+        assert router.complete("chat", []) == "Simulated reply (fast)"
+    assert backend.calls == ["fast"] * 5
+
+
+def test_falls_back_and_demotes_failing_model():
+    backend = SimulatedModelBackend({"broken": {"latency": 0.001, "error_rate": 1.0}, "fast": {"latency": 0.001}}, seed=0)
+    router = make_router(backend, {"chat": {"models": ["broken", "fast"], "max_cost": 0.1}}, min_calls=3)
+
+    for _ in range(10):
+        assert router.complete("chat", []) == "Simulated reply (fast)"
+    assert router.candidates("chat") == ["fast", "broken"]
+    assert router.snapshot()["chat"]["broken"]["error_rate"] == 1.0
+
+
+def test_timeout_counts_as_failure():
+    backend = SimulatedModelBackend({"hangs": {"latency": 5.0}, "fast": {"latency": 0.001}}, seed=0)
+    router = make_router(backend, {"chat": {"models": ["hangs", "fast"], "max_cost": 0.1, "timeout": 0.02}})
+
+    assert router.complete("chat", []) == "Simulated reply (fast)"
+    assert router.snapshot()["chat"]["hangs"]["error_rate"] == 1.0
+
+
+def test_unmeasured_models_stay_behind_measured_ones():
+    backend = SimulatedModelBackend({}, seed=0)
+    router = make_router(backend, {"analysis": {"models": ["slow", "fast", "hangs"], "max_cost": 0.1}})
+
+    # A slow but healthy measured model beats ones we know nothing about
+    for _ in range(3):
+        router._stats("analysis", "fast").record(5.0, True)
+    assert router.candidates("analysis") == ["fast", "slow", "hangs"]
+
+    # Unmeasured models only jump the queue when exploring
+    router.explore_rate = 1.0
+    assert router.candidates("analysis")[0] in ("slow", "hangs")
+
+
+def test_deadline_caps_total_time():
+    backend = SimulatedModelBackend({"hangs": {"latency": 5.0}, "slow": {"latency": 5.0}, "fast": {"latency": 0.001}}, seed=0)
+    router = make_router(backend, {"chat": {"models": ["hangs", "slow", "fast"], "max_cost": 0.1, "timeout": 0.05}},
+                         deadline=0.08)
+
+    start = time.time()
+    assert router.complete("chat", []) is None
+    assert time.time() - start < 0.2
+    # "slow" only got the remaining 0.03s, so it isn't blamed and "fast" is never tried
+    assert backend.calls == ["hangs", "slow"]
+    assert router.snapshot()["chat"]["hangs"]["calls"] == 1
+    assert router.snapshot()["chat"]["slow"]["calls"] == 0
+
+
+def test_stats_are_kept_per_task():
+    backend = SimulatedModelBackend({"fast": {"latency": 0.001}, "slow": {"latency": 0.001}}, seed=0)
+    routes = {"chat": {"models": ["slow", "fast"], "max_cost": 0.1},
+              "analysis": {"models": ["fast"], "max_cost": 0.1}}
+    router = make_router(backend, routes)
+
+    # Long analysis calls on "fast" must not make it look slow for chat
+    for _ in range(3):
+        router._stats("analysis", "fast").record(10.0, True)
+        router._stats("chat", "fast").record(0.01, True)
+        router._stats("chat", "slow").record(0.5, True)
+    assert router.candidates("chat") == ["fast", "slow"]
+
+
+def test_cost_ceiling_and_unpriced_models():
+    backend = SimulatedModelBackend({}, seed=0)
+    router = make_router(backend, {"chat": {"models": ["pricey", "fast"], "max_cost": 0.1}})
+    assert router.candidates("chat") == ["fast"]
+
+    with pytest.raises(ValueError):
+        make_router(backend, {"chat": {"models": ["unknown"], "max_cost": 0.1}})
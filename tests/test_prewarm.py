@@ -0,0 +1,103 @@
+from prewarm import PrewarmScheduler, PrewarmStore
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_producer():
+    calls = []
+
+    def produce():
+        calls.append(len(calls) + 1)
+        return calls[-1]
+    return produce, calls
+
+
+def test_store_rotates_through_pool():
+    store = PrewarmStore(ttl=60, pool_size=3, clock=FakeClock())
+    for value in ("a", "b", "c"):
+        store.put("k", value)
+    assert [store.get("k") for _ in range(4)] == ["a", "b", "c", "a"]
+
+
+def test_store_drops_expired_entries():
+    clock = FakeClock()
+    store = PrewarmStore(ttl=60, pool_size=3, clock=clock)
+    store.put("k", "old")
+    clock.now += 30
+    store.put("k", "new")
+    clock.now += 40
+    assert store.get("k") == "new"
+    assert store.fresh_count("k") == 1
+    clock.now += 30
+    assert store.get("k") is None
+
+
+def test_store_evicts_oldest_when_full():
+    clock = FakeClock()
+    store = PrewarmStore(ttl=600, pool_size=2, clock=clock)
+    store.put("k", "first")
+    clock.now += 1
+    store.put("k", "second")
+    store.get("k")  # rotation moves "first" to the back
+    clock.now += 1
+    store.put("k", "third")
+    assert sorted(store.get("k") for _ in range(2)) == ["second", "third"]
+
+
+def test_run_once_refreshes_before_expiry():
+    clock = FakeClock()
+    store = PrewarmStore(ttl=100, pool_size=3, clock=clock)
+    scheduler = PrewarmScheduler(store, interval=40)
+    produce, calls = make_producer()
+    scheduler.add_job("k", produce, target=3)
+
+    scheduler.run_once()
+    assert len(calls) == 3
+
+    # Still fresh for the next 60s but would expire before the cycle after
+    clock.now += 61
+    assert store.get("k") is not None
+    scheduler.run_once()
+    assert len(calls) == 6
+    assert store.fresh_count("k", max_age=scheduler.refresh_age) == 3
+
+    # Nothing to do while every entry outlives the next cycle
+    clock.now += 10
+    scheduler.run_once()
+    assert len(calls) == 6
+
+
+def test_run_once_skips_idle_keys_after_first_fill():
+    clock = FakeClock()
+    store = PrewarmStore(ttl=100, pool_size=1, clock=clock)
+    scheduler = PrewarmScheduler(store, interval=40, idle_after=50)
+    used, used_calls = make_producer()
+    idle, idle_calls = make_producer()
+    scheduler.add_job("used", used)
+    scheduler.add_job("idle", idle)
+
+    scheduler.run_once()
+    assert (len(used_calls), len(idle_calls)) == (1, 1)
+
+    clock.now += 70
+    store.get("used")
+    scheduler.run_once()
+    assert (len(used_calls), len(idle_calls)) == (2, 1)
+
+
+def test_failed_producer_is_retried_next_cycle():
+    store = PrewarmStore(ttl=100, pool_size=2, clock=FakeClock())
+    scheduler = PrewarmScheduler(store, interval=10)
+    results = iter([None, "ok", "ok"])
+    scheduler.add_job("k", lambda: next(results), target=2)
+
+    scheduler.run_once()
+    assert store.fresh_count("k") == 0
+    scheduler.run_once()
+    assert store.fresh_count("k") == 2
@@ -0,0 +1,103 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import quote
+
+import pytest
+
+import app as app_module
+from config import Config
+from result_store import ResultStore
+
+SECRET = "test-secret"
+
+
+def make_token(user_id, secret=SECRET):
+    encode = lambda data: base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+    signing_input = f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode({'sub': user_id, 'exp': time.time() + 60})}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).decode().rstrip('=')}"
+
+
+def auth(user_id):
+    return {"Authorization": f"Bearer {make_token(user_id)}"}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path / "results.db"), flush_interval=0.01)
+    monkeypatch.setattr(app_module, "result_store", store)
+    monkeypatch.setattr(Config, "SUPABASE_JWT_SECRET", SECRET)
+    monkeypatch.setattr(Config, "RESULT_STORE_TRUST_USER_HEADER", False)
+    return store
+
+
+@pytest.fixture
+def client(store):
+    return app_module.app.test_client()
+
+
+def test_results_are_isolated_per_user(store, client):
+    store.save("alice", "text", 80, "crypto", {"summary": "alice's"})
+    store.flush()
+    result_id = store.query("alice")["results"][0]["id"]
+
+    assert client.get(f"/api/history/{result_id}", headers=auth("alice")).status_code == 200
+    assert client.get(f"/api/history/{result_id}", headers=auth("mallory")).status_code == 404
+    assert client.get("/api/history", headers=auth("mallory")).get_json()["results"] == []
+    assert client.get(f"/api/history/{result_id}").status_code == 401
+
+    forged = {"Authorization": f"Bearer {make_token('alice', secret='wrong')}"}
+    assert client.get(f"/api/history/{result_id}", headers=forged).status_code == 401
+
+
+def test_cursor_pagination_walks_every_result_once(store, client):
+    for i in range(7):
+        store.save("alice", "text", i, None, {"n": i})
+    store.flush()
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/history?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url, headers=auth("alice")).get_json()
+        seen.extend(result["analysis_data"]["n"] for result in page["results"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+        # Opaque and URL-safe: usable as a query parameter without encoding
+        assert quote(cursor, safe="") == cursor
+    assert seen == list(range(6, -1, -1))
+
+    assert client.get("/api/history?cursor=not-a-cursor", headers=auth("alice")).status_code == 400
+
+
+def test_since_until_filters(store, client):
+    store.save("alice", "text", 10, None, {})
+    store.flush()
+    created_at = store.query("alice")["results"][0]["created_at"]
+    day = created_at[:10]
+
+    def count(query):
+        response = client.get(f"/api/history?{query}", headers=auth("alice"))
+        assert response.status_code == 200
+        return len(response.get_json()["results"])
+
+    assert count(f"since={day}") == 1
+    assert count(f"since={day}T00:00:00Z") == 1
+    assert count(f"until={day}") == 0
+    assert count(f"since={quote(day + 'T00:00:00+14:00')}") == 1
+    assert count("since=2999-01-01") == 0
+    assert client.get("/api/history?since=yesterday", headers=auth("alice")).status_code == 400
+
+
+def test_history_fails_closed_without_jwt_secret(store, client, monkeypatch):
+    monkeypatch.setattr(Config, "SUPABASE_JWT_SECRET", None)
+    headers = {"X-User-Id": "alice"}
+
+    assert client.get("/api/history", headers=headers).status_code == 503
+    assert client.get("/api/history/1", headers=headers).status_code == 503
+
+    monkeypatch.setattr(Config, "RESULT_STORE_TRUST_USER_HEADER", True)
+    assert client.get("/api/history", headers=headers).status_code == 200